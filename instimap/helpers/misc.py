@@ -0,0 +1,23 @@
+"""Misc helpers shared across apps."""
+import unicodedata
+
+# ASCII bytes which are not alphanumeric or a dash, for bytes.translate
+_SLUG_DELETE = bytes(i for i in range(128) if not (chr(i).isalnum() or chr(i) == "-"))
+
+
+def get_url_friendly(name):
+    """Converts the name to a url friendly string for use in `str_id`"""
+    # Return blank in case None is passed
+    if not name:
+        return ""
+
+    # Strip whitespaces and replace with dashes
+    temp = "-".join(name.lower().split())
+
+    # Decompose accented characters and drop whatever is not ASCII
+    if not temp.isascii():
+        temp = unicodedata.normalize("NFKD", temp)
+    temp = temp.encode("ascii", "ignore")
+
+    # Remove special characters except dashes
+    return temp.translate(None, _SLUG_DELETE).decode("ascii")
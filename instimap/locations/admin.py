@@ -1,8 +1,37 @@
+from django import forms
 from django.contrib import admin
+from django.contrib.admin.widgets import FilteredSelectMultiple
 from locations.models import Location
 
 
+class LocationAdminForm(forms.ModelForm):
+    # The admin leaves out m2m fields with a custom through model, so
+    # declare it here. A connection can be stored in either direction,
+    # so it is read and saved through both sides instead of adjacent_locs.set()
+    adjacent_locs = forms.ModelMultipleChoiceField(
+        queryset=Location.objects.all(),
+        required=False,
+        widget=FilteredSelectMultiple("adjacent locations", is_stacked=False),
+    )
+
+    class Meta:
+        model = Location
+        exclude = ("adjacent_locs",)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.pk is not None:
+            self.initial["adjacent_locs"] = list(
+                self.instance.get_adjacent_locations()
+            )
+
+    def _save_m2m(self):
+        super()._save_m2m()
+        self.instance.set_adjacent_locations(self.cleaned_data["adjacent_locs"])
+
+
 class LocationAdmin(admin.ModelAdmin):
+    form = LocationAdminForm
     list_filter = ("reusable",)
     list_display = ("short_name", "name", "reusable")
     search_fields = ["short_name", "name"]
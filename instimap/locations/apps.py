@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class LocationsConfig(AppConfig):
     name = "locations"
+
+    def ready(self):
+        import locations.signals  # noqa: F401  pylint: disable=C0415,W0611
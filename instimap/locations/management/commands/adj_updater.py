@@ -25,14 +25,59 @@ class UpdateAdjList:
         return name
 
     @staticmethod
-    def calculate_distance(loc1, loc2):
-        # print(f"calculating distance between{loc1} and {loc2}")
+    def get_db_name(adj_name):
+        """The Location name for a key of the adj_list, ints are nodes."""
+        if isinstance(adj_name, int):
+            return f"Node{adj_name}"
+        return adj_name
+
+    @staticmethod
+    def build_distances(adj_list, location_model, distance_model):
+        """Unsaved `distance_model` rows for the connections in `adj_list`
+        which are not in the database yet, one per pair of locations.
+        Models are passed in so that migrations can use historical ones."""
+        loc_map = {}
+        for location in location_model.objects.all():
+            loc_map.setdefault(location.name, location)
+
+        existing = {
+            frozenset(p)
+            for p in distance_model.objects.values_list("location1_id", "location2_id")
+        }
+        pairs = {}
+        for x in adj_list:
+            for y in adj_list[x]:
+                loc1 = loc_map.get(UpdateAdjList.get_db_name(x))
+                loc2 = loc_map.get(UpdateAdjList.get_db_name(y))
+                if loc1 is None or loc2 is None or loc1.id == loc2.id:
+                    continue
+                pair = frozenset((loc1.id, loc2.id))
+                if pair not in existing:
+                    pairs.setdefault(pair, (loc1, loc2))
+
+        return [
+            distance_model(
+                location1=loc1,
+                location2=loc2,
+                distance_sq=UpdateAdjList.calculate_distance_sq(loc1, loc2),
+            )
+            for loc1, loc2 in pairs.values()
+        ]
+
+    @staticmethod
+    def calculate_distance_sq(loc1, loc2):
+        """Squared pixel distance, exact since pixels are integers."""
         x_loc1 = loc1.pixel_x if loc1.pixel_x else 0
         y_loc1 = loc1.pixel_y if loc1.pixel_y else 0
         x_loc2 = loc2.pixel_x if loc2.pixel_x else 0
         y_loc2 = loc2.pixel_y if loc2.pixel_y else 0
 
-        return m.sqrt(0.001 * ((x_loc1 - x_loc2) ** 2 + (y_loc1 - y_loc2) ** 2))
+        return (x_loc1 - x_loc2) ** 2 + (y_loc1 - y_loc2) ** 2
+
+    @staticmethod
+    def calculate_distance(loc1, loc2):
+        # print(f"calculating distance between{loc1} and {loc2}")
+        return m.sqrt(0.001 * UpdateAdjList.calculate_distance_sq(loc1, loc2))
 
     """
     This function updates the adj_list with the new connections and distances betweem them.
@@ -40,27 +85,22 @@ class UpdateAdjList:
 
     def add_conns(self, loc1, connections=[]):
         new_data = self.adj_list.copy()
-        # print(new_data)
-        # print(str(loc1))
-        # print(connections)
+        connections = [loc2 for loc2 in connections if loc2]
+        if not connections:
+            return
+
+        loc1_name = UpdateAdjList.get_location_name(loc1)
+        new_data.setdefault(loc1_name, {})
         for loc2 in connections:
-            if loc2:
-                distance = UpdateAdjList.calculate_distance(loc1, loc2)
-                loc1_name = UpdateAdjList.get_location_name(loc1)
-                loc2_name = UpdateAdjList.get_location_name(loc2)
-                try:
-                    new_data[loc1_name]
-                except KeyError:
-                    new_data[loc1_name] = {}
-                try:
-                    new_data[loc2_name]
-                except KeyError:
-                    new_data[loc2_name] = {}
-                new_data[loc1_name][loc2_name] = distance
-                new_data[loc2_name][loc1_name] = distance
-
-                with open(self.adj_list_path, "w") as f:
-                    f.write(str(new_data))
+            distance = UpdateAdjList.calculate_distance(loc1, loc2)
+            loc2_name = UpdateAdjList.get_location_name(loc2)
+            new_data.setdefault(loc2_name, {})
+            new_data[loc1_name][loc2_name] = distance
+            new_data[loc2_name][loc1_name] = distance
+
+        # Write the file once for all connections
+        with open(self.adj_list_path, "w") as f:
+            f.write(str(new_data))
 
     def delete_all_connections(self, location):
         new_data = self.adj_list.copy()
@@ -3,7 +3,8 @@ from django.core.management.base import BaseCommand
 from django.db.models import Q
 import sys
 from locations.serializers import LocationSerializerMin
-from locations.models import Location
+from locations.models import Location, LocationLocationDistance
+from locations.management.commands.adj_updater import UpdateAdjList
 import os
 import math as m
 
@@ -402,26 +403,16 @@ class handle_entry:
                 f.write(str(self.adj_list))
 
     """
-    Updates the 'connected_locs' field of Location objects with conected locations
+    Updates the 'adjacent_locs' of Location objects with conected locations
     """
 
     def update_locations_with_connected_loc(self):
         # Need to run this to ensure the location objects contain the adjacent locations that they are connected to.
-        all_locations = Location.objects.all()
-        for location in all_locations:
-            try:
-                adj_locs_dict = self.adj_list[location.name]
-                connected_location_str = ""
-                for i in adj_locs_dict:
-                    if isinstance(i, int):
-                        connected_location_str += f"Node{i},"
-                    else:
-                        connected_location_str += f"{i},"
-                connected_location_str.replace(connected_location_str[-1], "", 1)
-                location.connected_locs = connected_location_str
-                location.save()
-            except KeyError:
-                pass
+        LocationLocationDistance.objects.bulk_create(
+            UpdateAdjList.build_distances(
+                self.adj_list, Location, LocationLocationDistance
+            )
+        )
 
     """Gets the nearest Node near a location on the map."""
 
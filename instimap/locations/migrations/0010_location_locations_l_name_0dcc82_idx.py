@@ -0,0 +1,17 @@
+# Generated by Django 5.0.7 on 2026-10-14 11:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('locations', '0009_location_images'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='location',
+            index=models.Index(fields=['name'], name='locations_l_name_0dcc82_idx'),
+        ),
+    ]
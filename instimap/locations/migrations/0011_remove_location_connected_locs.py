@@ -0,0 +1,70 @@
+# Generated by Django 5.0.7 on 2026-10-14 12:00
+
+import math
+
+from django.db import migrations
+
+
+def connected_locs_to_adjacent_locs(apps, schema_editor):
+    """Copy the comma separated `connected_locs` into LocationLocationDistance rows."""
+    Location = apps.get_model("locations", "Location")
+    LocationLocationDistance = apps.get_model("locations", "LocationLocationDistance")
+
+    loc_map = {}
+    for loc in Location.objects.all():
+        loc_map.setdefault(loc.name, loc)
+
+    pairs = {
+        frozenset(p)
+        for p in LocationLocationDistance.objects.values_list(
+            "location1_id", "location2_id"
+        )
+    }
+    llds = []
+    for loc1 in Location.objects.exclude(connected_locs__isnull=True).exclude(
+        connected_locs=""
+    ):
+        for name in loc1.connected_locs.split(","):
+            name = name.strip()
+            if not name:
+                continue
+            loc2 = loc_map.get(name, loc_map.get("Node" + name))
+            if loc2 is None or loc2.id == loc1.id:
+                continue
+
+            pair = frozenset((loc1.id, loc2.id))
+            if pair in pairs:
+                continue
+            pairs.add(pair)
+
+            distance = math.sqrt(
+                0.001
+                * (
+                    ((loc1.pixel_x or 0) - (loc2.pixel_x or 0)) ** 2
+                    + ((loc1.pixel_y or 0) - (loc2.pixel_y or 0)) ** 2
+                )
+            )
+            llds.append(
+                LocationLocationDistance(
+                    location1=loc1, location2=loc2, distance=distance
+                )
+            )
+
+    LocationLocationDistance.objects.bulk_create(llds)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('locations', '0010_location_locations_l_name_0dcc82_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            connected_locs_to_adjacent_locs, migrations.RunPython.noop
+        ),
+        migrations.RemoveField(
+            model_name='location',
+            name='connected_locs',
+        ),
+    ]
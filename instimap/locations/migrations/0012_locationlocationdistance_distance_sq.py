@@ -0,0 +1,33 @@
+# Generated by Django 5.0.7 on 2026-10-14 12:01
+
+from django.db import migrations, models
+
+
+def distance_to_distance_sq(apps, schema_editor):
+    """`distance` was stored as sqrt(0.001 * d^2), recover the squared pixel distance."""
+    LocationLocationDistance = apps.get_model("locations", "LocationLocationDistance")
+
+    llds = list(LocationLocationDistance.objects.filter(distance__lt=100000000))
+    for lld in llds:
+        lld.distance_sq = round(lld.distance**2 * 1000)
+    LocationLocationDistance.objects.bulk_update(llds, ["distance_sq"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('locations', '0011_remove_location_connected_locs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='locationlocationdistance',
+            name='distance_sq',
+            field=models.BigIntegerField(default=10000000000000000),
+        ),
+        migrations.RunPython(distance_to_distance_sq, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='locationlocationdistance',
+            name='distance',
+        ),
+    ]
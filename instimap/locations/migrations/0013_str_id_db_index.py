@@ -0,0 +1,41 @@
+# Generated by Django 5.0.7 on 2026-10-14 12:02
+
+from django.db import migrations, models
+from helpers.misc import get_url_friendly
+
+
+def fill_str_id(apps, schema_editor):
+    """Compute `str_id` for rows that were written without going through save()."""
+    Body = apps.get_model("locations", "Body")
+    Location = apps.get_model("locations", "Location")
+
+    bodies = list(Body.objects.filter(str_id__isnull=True))
+    for body in bodies:
+        body.str_id = get_url_friendly(body.canonical_name or body.name)
+    Body.objects.bulk_update(bodies, ["str_id"])
+
+    locations = list(Location.objects.filter(str_id__isnull=True))
+    for location in locations:
+        location.str_id = get_url_friendly(location.short_name)
+    Location.objects.bulk_update(locations, ["str_id"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('locations', '0012_locationlocationdistance_distance_sq'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_str_id, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='body',
+            name='str_id',
+            field=models.CharField(db_index=True, editable=False, max_length=50, null=True),
+        ),
+        migrations.AlterField(
+            model_name='location',
+            name='str_id',
+            field=models.CharField(db_index=True, editable=False, max_length=100, null=True),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.7 on 2026-10-14 12:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('locations', '0013_str_id_db_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='location',
+            name='lat',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='location',
+            name='lng',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.0.7 on 2026-10-14 12:11
+
+from pathlib import Path
+
+from django.db import migrations
+from locations.management.commands.adj_updater import UpdateAdjList
+
+ADJ_LIST_PATH = (
+    Path(__file__).resolve().parent.parent / "management" / "commands" / "adj_list.py"
+)
+
+
+def seed_adjacent_locs(apps, schema_editor):
+    """Copy the connections of the adj_list file into LocationLocationDistance."""
+    Location = apps.get_model("locations", "Location")
+    LocationLocationDistance = apps.get_model("locations", "LocationLocationDistance")
+
+    with open(ADJ_LIST_PATH, "r") as f:
+        adj_list = dict(eval(f.read()))
+
+    LocationLocationDistance.objects.bulk_create(
+        UpdateAdjList.build_distances(adj_list, Location, LocationLocationDistance)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('locations', '0014_location_lat_lng_float'),
+    ]
+
+    operations = [
+        migrations.RunPython(seed_adjacent_locs, migrations.RunPython.noop),
+    ]
@@ -1,21 +1,12 @@
 """Models for Locations."""
 from uuid import uuid4
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F, Q
 from locations.management.commands.adj_updater import UpdateAdjList
 from django.contrib.auth.models import User
 from django.utils.timezone import now
+from helpers.misc import get_url_friendly
 
-def get_url_friendly(name):
-    """Converts the name to a url friendly string for use in `str_id`"""
-    # Return blank in case None is passed
-    if not name:
-        return ""
-
-    # Strip whitespaces and replace with dashes
-    temp = "-".join(name.lower().split())
-
-    # Remove special characters except dashes
-    return "".join(c for c in temp if c.isalnum() or c == "-")
 
 PERMISSION_CHOICES = (
     ("AddE", "Add Event"),
@@ -32,7 +23,7 @@ class Body(models.Model):
     """An organization or club which may conduct events."""
 
     id = models.UUIDField(primary_key=True, default=uuid4, editable=False)
-    str_id = models.CharField(max_length=50, editable=False, null=True)
+    str_id = models.CharField(max_length=50, editable=False, null=True, db_index=True)
     time_of_creation = models.DateTimeField(auto_now_add=True)
     time_of_modification = models.DateTimeField(auto_now=True)
 
@@ -62,6 +53,26 @@ class Body(models.Model):
         verbose_name_plural = "Bodies"
         ordering = ("name",)
 
+class LocationQuerySet(models.QuerySet):
+    """QuerySet for Location."""
+
+    def with_parent(self):
+        """Join the parent location, for callers which access `loc.parent`."""
+        return self.select_related("parent")
+
+    def for_adj_list(self):
+        """Fetch only the columns needed to update the adjacency list."""
+        return self.only("id", "name", "pixel_x", "pixel_y")
+
+    def nearest_to(self, pixel_x, pixel_y):
+        """Order by squared pixel distance from the given point,
+        leaving out locations without coordinates."""
+        return self.filter(pixel_x__isnull=False, pixel_y__isnull=False).alias(
+            distance_sq=(F("pixel_x") - pixel_x) * (F("pixel_x") - pixel_x)
+            + (F("pixel_y") - pixel_y) * (F("pixel_y") - pixel_y)
+        ).order_by("distance_sq", "name")
+
+
 class Location(models.Model):
     """A unique location, chiefly venues for events.
 
@@ -71,7 +82,9 @@ class Location(models.Model):
     """
 
     id = models.UUIDField(primary_key=True, default=uuid4, editable=False)
-    str_id = models.CharField(max_length=100, editable=False, null=True)
+    str_id = models.CharField(
+        max_length=100, editable=False, null=True, db_index=True
+    )
     time_of_creation = models.DateTimeField(auto_now_add=True)
     images = models.ImageField(upload_to="locations/images/", blank=True, null=True)
     name = models.CharField(max_length=150)
@@ -83,10 +96,9 @@ class Location(models.Model):
 
     pixel_x = models.IntegerField(blank=True, null=True)
     pixel_y = models.IntegerField(blank=True, null=True)
-    lat = models.DecimalField(max_digits=9, decimal_places=6, blank=True, null=True)
-    lng = models.DecimalField(max_digits=9, decimal_places=6, blank=True, null=True)
+    lat = models.FloatField(blank=True, null=True)
+    lng = models.FloatField(blank=True, null=True)
     reusable = models.BooleanField(default=False)
-    connected_locs = models.TextField(blank=True, null=True)
     adjacent_locs = models.ManyToManyField(
         "locations.Location",
         through="LocationLocationDistance",
@@ -96,64 +108,96 @@ class Location(models.Model):
     eatery = models.BooleanField(default=False)
     hostel = models.BooleanField(default=False)
 
+    objects = LocationQuerySet.as_manager()
+
+    # Fields which feed into the adjacency list
+    ADJ_FIELDS = ("name", "pixel_x", "pixel_y")
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.stash_adj_fields()
+        return instance
+
+    def stash_adj_fields(self):
+        """Remember the adjacency fields as they are in the database.
+        Deferred fields are left unknown, which forces a recompute."""
+        if all(f in self.__dict__ for f in self.ADJ_FIELDS):
+            self._orig_adj_fields = tuple(getattr(self, f) for f in self.ADJ_FIELDS)
+        else:
+            self._orig_adj_fields = None
+
+    def adj_fields_changed(self):
+        """Whether the adjacency list needs to be recomputed on save.
+        New locations have no connections yet, those are added through
+        `adjacent_locs` (see `locations.signals`)."""
+        if self._state.adding:
+            return False
+        if getattr(self, "_orig_adj_fields", None) is None:
+            return True
+        return self._orig_adj_fields != tuple(
+            getattr(self, f) for f in self.ADJ_FIELDS
+        )
+
+    @transaction.atomic
     def save(self, *args, **kwargs):  # pylint: disable =W0222
         # print("reached save function")
         print(vars(self))
-        update = UpdateAdjList()
         self.str_id = get_url_friendly(self.short_name)
-        adj_list = update.load_adj_list()
-        if self.connected_locs:
-            adj_data = self.connected_locs.split(",")
-        elif update.get_location_name(self) in adj_list:
-            adj_data = list(adj_list[update.get_location_name(self)].keys())
-        else:
-            # self.connected_locs = []
-            adj_data = []
-        # print(adj_data)
-        if Location.objects.filter(name=self.name).exists():
-            # print("reached 110")
-            old_instance = Location.objects.filter(name=self.name).first()
-            # print(old_instance)
-            if old_instance.connected_locs:
-                old_instance_adj = old_instance.connected_locs.split(",")
-            else:
-                old_instance_adj = []
-
-            deletedConnections = list(set(old_instance_adj) - set(adj_data))
-
-            UpdatedConnectionsLoc = []
-            for loc in adj_data:
-                print(loc)
-                if loc:
-                    loc_object = Location.objects.filter(name=loc).first()
-                    if loc_object is None:
-                        loc_object = Location.objects.filter(name=("Node"+str(loc))).first()
-                    UpdatedConnectionsLoc.append(loc_object)
-                    # print("here")
-                    # print(UpdatedConnectionsLoc)
-            update.add_conns(
-                self, UpdatedConnectionsLoc
-            )  # Accounts for coordinates change also.
-
-            deleted_connections_locs = []
-            if deletedConnections:
-                for loc in deletedConnections:
-                    deleted_loc = Location.objects.filter(name=loc).first()
-                    if deleted_loc is not None:
-                        deleted_connections_locs.append(deleted_loc)
-                update.delete_connections(self, deleted_connections_locs)
-
-        else:
-            if adj_data:
-                locs = adj_data
-                connections = [
-                    Location.objects.filter(name=x).first() for x in locs if x
-                ]
-
-                update.add_conns(self, connections)
+        # Skip the adjacency pipeline for edits to unrelated fields
+        adj_changed = self.adj_fields_changed()
 
         super().save(*args, **kwargs)
+        if adj_changed:
+            self.update_adj_list()
+        self.stash_adj_fields()
+
+    def get_adjacent_locations(self):
+        """All locations connected to this one, in either direction."""
+        return Location.objects.filter(
+            Q(lld1__location2=self) | Q(lld2__location1=self)
+        ).distinct()
+
+    def set_adjacent_locations(self, locations):
+        """Connect this location to exactly `locations`. Existing connections
+        may be stored in either direction, new ones are added from this side."""
+        current = set(self.get_adjacent_locations())
+        locations = set(locations)
+
+        removed = current - locations
+        if removed:
+            self.adjacent_locs.remove(*removed)
+            self.adjacent_loc.remove(*removed)
+
+        added = locations - current
+        if added:
+            self.adjacent_locs.add(*added)
+
+    def update_adj_list(self):
+        """Recompute the distances to all connected locations, including
+        connections which so far only exist in the adj_list file."""
+        update = UpdateAdjList()
+        connections = {
+            loc.id: loc for loc in self.get_adjacent_locations().for_adj_list()
+        }
 
+        adj_names = [
+            UpdateAdjList.get_db_name(name)
+            for name in update.adj_list.get(update.get_location_name(self), {})
+        ]
+        if adj_names:
+            by_name = {}
+            for loc in Location.objects.filter(name__in=adj_names).for_adj_list():
+                by_name.setdefault(loc.name, loc)
+            for loc in by_name.values():
+                connections.setdefault(loc.id, loc)
+        connections.pop(self.id, None)
+
+        connections = list(connections.values())
+        update.add_conns(self, connections)
+        LocationLocationDistance.update_distances(self, connections)
+
+    @transaction.atomic
     def delete(self, *args, **kwargs):
         UpdateAdjList().delete_all_connections(self)
         super().delete(*args, **kwargs)
@@ -172,6 +216,7 @@ class Location(models.Model):
                 ]
             ),
             models.Index(fields=["reusable", "group_id"]),
+            models.Index(fields=["name"]),
         ]
 
 class BodyRole(models.Model):
@@ -233,7 +278,27 @@ class LocationLocationDistance(models.Model):
     location2 = models.ForeignKey(
         Location, on_delete=models.CASCADE, default=uuid4, related_name="lld2"
     )
-    distance = models.FloatField(default=100000000)
+    # Squared pixel distance; compare these directly, no sqrt needed
+    distance_sq = models.BigIntegerField(default=10**16)
+
+    @classmethod
+    def update_distances(cls, location, connections):
+        """Recompute the stored distance between `location` and each
+        of `connections`, whichever side of the row they are on."""
+        connections = {loc.id: loc for loc in connections if loc}
+        llds = list(
+            cls.objects.filter(
+                Q(location1=location, location2__in=list(connections))
+                | Q(location2=location, location1__in=list(connections))
+            )
+        )
+        for lld in llds:
+            if lld.location1_id == location.id:
+                other = connections[lld.location2_id]
+            else:
+                other = connections[lld.location1_id]
+            lld.distance_sq = UpdateAdjList.calculate_distance_sq(location, other)
+        cls.objects.bulk_update(llds, ["distance_sq"])
 
     class Meta:
         verbose_name = "Location-Location Distance"
@@ -3,9 +3,20 @@ from rest_framework import serializers
 from locations.models import Location
 
 
+def coordinate_field():
+    """lat/lng are stored as floats, but the API keeps returning
+    fixed point strings as it did for the old DecimalField."""
+    return serializers.DecimalField(
+        max_digits=9, decimal_places=6, required=False, allow_null=True
+    )
+
+
 class LocationSerializer(serializers.ModelSerializer):
     """Serializer for Location."""
 
+    lat = coordinate_field()
+    lng = coordinate_field()
+
     class Meta:
         model = Location
         fields = (
@@ -29,6 +40,9 @@ class LocationSerializer(serializers.ModelSerializer):
 class LocationSerializerMin(serializers.ModelSerializer):
     """Minimal serializer for Location."""
 
+    lat = coordinate_field()
+    lng = coordinate_field()
+
     class Meta:
         model = Location
         fields = ("id", "name", "short_name", "lat", "lng")
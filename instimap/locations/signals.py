@@ -0,0 +1,23 @@
+"""Signals for locations."""
+from django.db.models.signals import m2m_changed
+from django.dispatch import receiver
+from locations.management.commands.adj_updater import UpdateAdjList
+from locations.models import Location, LocationLocationDistance
+
+
+@receiver(m2m_changed, sender=Location.adjacent_locs.through)
+def adjacent_locs_changed(sender, instance, action, reverse, model, pk_set, **kwargs):
+    """Keep the adjacency list and distances in sync with `adjacent_locs`."""
+    if action == "post_add":
+        connections = list(model.objects.for_adj_list().in_bulk(pk_set).values())
+        UpdateAdjList().add_conns(instance, connections)
+        LocationLocationDistance.update_distances(instance, connections)
+
+    elif action == "post_remove":
+        connections = list(model.objects.for_adj_list().in_bulk(pk_set).values())
+        UpdateAdjList().delete_connections(instance, connections)
+
+    elif action == "pre_clear":
+        # pk_set is not available for clear, so look the connections up first
+        related = instance.adjacent_loc if reverse else instance.adjacent_locs
+        UpdateAdjList().delete_connections(instance, list(related.for_adj_list()))
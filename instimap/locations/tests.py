@@ -2,13 +2,20 @@
 from django.utils import timezone
 import time
 import random
+from unittest import mock
 from rest_framework.test import APITestCase
 from rest_framework import status
 # from events.models import Event
 from django.contrib.auth.models import User
+from django.contrib.admin.sites import site
+from django.test import RequestFactory
 from locations.serializers import LocationSerializer
+from locations.admin import LocationAdmin
 from locations.models import Location
 from locations.models import Body, BodyRole, InstituteRole,UserProfile
+from locations.models import LocationLocationDistance
+from locations.management.commands.adj_updater import UpdateAdjList
+from helpers.misc import get_url_friendly
 # from bodies.models import Body
 
 from uuid import uuid4
@@ -21,17 +28,6 @@ def get_new_user():
     UserProfile.objects.create(name="TestUserProfile", user=user, ldap_id="test")
     return user
 
-def get_url_friendly(name):
-    """Converts the name to a url friendly string for use in `str_id`"""
-    # Return blank in case None is passed
-    if not name:
-        return ""
-
-    # Strip whitespaces and replace with dashes
-    temp = "-".join(name.lower().split())
-
-    # Remove special characters except dashes
-    return "".join(c for c in temp if c.isalnum() or c == "-")
 
 
 
@@ -69,6 +65,123 @@ class LocationTestCase(APITestCase):
             ),
         )
 
+    def test_url_friendly(self):
+        """Check str_id generation."""
+        self.assertEqual(get_url_friendly(None), "")
+        self.assertEqual(get_url_friendly("  Test  Location & 0 "), "test-location--0")
+        self.assertEqual(get_url_friendly("Café_Coffee-Day!"), "cafecoffee-day")
+
+    def test_location_save_adj_list(self):
+        """Check that the adjacency list is only updated when needed."""
+        location = Location.objects.get(id=self.reusable_test_location.id)
+
+        with mock.patch.object(Location, "update_adj_list") as update_adj_list:
+            location.description = "Changed description"
+            location.save()
+            update_adj_list.assert_not_called()
+
+            location.pixel_x = 100
+            location.save()
+            update_adj_list.assert_called_once()
+
+            # Saved values become the new baseline
+            location.save()
+            update_adj_list.assert_called_once()
+
+    # Keep the committed adj_list file out of this test
+    @mock.patch.object(UpdateAdjList, "delete_connections")
+    @mock.patch.object(UpdateAdjList, "add_conns")
+    def test_location_adjacent_locs(self, add_conns, delete_connections):
+        """Check that distances follow adjacent_locs and coordinate changes."""
+        loc1, loc2 = Location.objects.bulk_create(
+            [
+                Location(name="TestLocation1", pixel_x=0, pixel_y=0),
+                Location(name="TestLocation2", pixel_x=30, pixel_y=40),
+            ]
+        )
+
+        loc1.adjacent_locs.add(loc2)
+        add_conns.assert_called_once_with(loc1, [loc2])
+        lld = LocationLocationDistance.objects.get(location1=loc1, location2=loc2)
+        self.assertEqual(lld.distance_sq, 50 ** 2)
+        self.assertEqual(list(loc2.get_adjacent_locations()), [loc1])
+
+        loc2.pixel_x, loc2.pixel_y = 60, 80
+        loc2.save()
+        lld.refresh_from_db()
+        self.assertEqual(lld.distance_sq, 100 ** 2)
+
+        loc1.adjacent_locs.remove(loc2)
+        delete_connections.assert_called_once_with(loc1, [loc2])
+        self.assertFalse(loc1.get_adjacent_locations().exists())
+
+    @mock.patch.object(UpdateAdjList, "add_conns")
+    def test_location_save_adj_list_only(self, add_conns):
+        """Check that a coordinate edit reaches connections only known from
+        the adj_list file (Node0 is connected to Amul Parlour and Node1)."""
+        node0 = Location.objects.create(name="Node0", pixel_x=0, pixel_y=0)
+        amul = Location.objects.create(name="Amul Parlour", pixel_x=10, pixel_y=0)
+        node1 = Location.objects.create(name="Node1", pixel_x=0, pixel_y=10)
+        self.assertFalse(node0.get_adjacent_locations().exists())
+
+        node0.pixel_x = 5
+        node0.save()
+        add_conns.assert_called_once()
+        location, connections = add_conns.call_args.args
+        self.assertEqual(location, node0)
+        self.assertEqual(set(connections), {amul, node1})
+
+    @mock.patch.object(UpdateAdjList, "add_conns")
+    def test_location_save_int_nodes(self, add_conns):
+        """Check saving a location whose adj_list neighbours are int nodes
+        (Security Check Point is connected to 255 and 245)."""
+        node255 = Location.objects.create(name="Node255", pixel_x=10, pixel_y=10)
+        node245 = Location.objects.create(name="Node245", pixel_x=20, pixel_y=20)
+        location = Location.objects.create(
+            name="Security Check Point", pixel_x=0, pixel_y=0
+        )
+
+        location = Location.objects.get(id=location.id)
+        location.pixel_x = 20
+        location.save()
+        add_conns.assert_called_once()
+        self.assertEqual(set(add_conns.call_args.args[1]), {node255, node245})
+
+    @mock.patch.object(UpdateAdjList, "delete_connections")
+    @mock.patch.object(UpdateAdjList, "add_conns")
+    def test_location_admin_adjacent_locs(self, add_conns, delete_connections):
+        """Check that the admin edits connections stored in either direction."""
+        loc_a, loc_b, loc_c = Location.objects.bulk_create(
+            [
+                Location(name="TestLocationA", pixel_x=0, pixel_y=0),
+                Location(name="TestLocationB", pixel_x=3, pixel_y=4),
+                Location(name="TestLocationC", pixel_x=6, pixel_y=8),
+            ]
+        )
+        loc_a.adjacent_locs.add(loc_b)
+
+        request = RequestFactory().get("/")
+        request.user = self.user
+        form_class = LocationAdmin(Location, site).get_form(request, loc_b)
+        initial = form_class(instance=loc_b).initial["adjacent_locs"]
+        self.assertEqual(initial, [loc_a])
+
+        # Keep A, add C
+        data = {"name": loc_b.name, "adjacent_locs": [str(loc_a.id), str(loc_c.id)]}
+        form = form_class(data, instance=loc_b)
+        self.assertTrue(form.is_valid(), form.errors)
+        form.save()
+        self.assertEqual(set(loc_b.get_adjacent_locations()), {loc_a, loc_c})
+        self.assertEqual(LocationLocationDistance.objects.count(), 2)
+
+        # Dropping A removes the row stored from A's side
+        data = {"name": loc_b.name, "adjacent_locs": [str(loc_c.id)]}
+        form = form_class(data, instance=loc_b)
+        self.assertTrue(form.is_valid(), form.errors)
+        form.save()
+        self.assertEqual(list(loc_b.get_adjacent_locations()), [loc_c])
+        self.assertFalse(loc_a.get_adjacent_locations().exists())
+
     def test_location_get(self):
         """Check that only reusable locations are listed in get."""
         # Non reusable location
@@ -87,10 +200,15 @@ class LocationTestCase(APITestCase):
         self.assertEqual(response.data[0]["id"], str(self.reusable_test_location.id))
 
         # Reusable locations
-        Location.objects.create(name="TestLocation1", reusable=True, group_id=1)
-        Location.objects.create(name="TestLocation2", reusable=True, group_id=2)
-        Location.objects.create(name="TestLocation3", reusable=True, group_id=3)
-        Location.objects.create(name="TestLocation4", reusable=True, group_id=3)
+        # bulk_create skips save(), these have no connections anyway
+        Location.objects.bulk_create(
+            [
+                Location(name="TestLocation1", reusable=True, group_id=1),
+                Location(name="TestLocation2", reusable=True, group_id=2),
+                Location(name="TestLocation3", reusable=True, group_id=3),
+                Location(name="TestLocation4", reusable=True, group_id=3),
+            ]
+        )
 
         # Get all reusable locations
         url = "/api/locations"
@@ -140,6 +258,16 @@ class LocationTestCase(APITestCase):
         
         response = self.client.post(url, data, format="json")
         self.assertEqual(response.status_code, 201)
+
+        # Coordinates are floats in the model but fixed point in the API
+        data = {"name": "TestEvent2", "lat": "19.1334", "lng": 72.9133}
+        response = self.client.post(url, data, format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["lat"], "19.133400")
+        self.assertEqual(response.data["lng"], "72.913300")
+        location = Location.objects.get(id=response.data["id"])
+        self.assertIsInstance(location.lat, float)
+        self.assertAlmostEqual(location.lat, 19.1334)
         
         # self.user.profile.can_create_locations = False
         # self.user.profile.save()
@@ -193,9 +321,13 @@ class LocationTestCase(APITestCase):
         '''Test if nearest location is returned'''
         url = '/api/nearest/'
         data = {'xcor':2000,'ycor':2000}
-        location1 = Location.objects.create(name="TestLocation1", pixel_x=2000, pixel_y=2000)
-        location2 = Location.objects.create(name="TestLocation2", pixel_x=2001, pixel_y=2000)
-        location3 = Location.objects.create(name="TestLocation3", pixel_x=2002, pixel_y=2000)
+        location1, location2, location3 = Location.objects.bulk_create(
+            [
+                Location(name="TestLocation1", pixel_x=2000, pixel_y=2000),
+                Location(name="TestLocation2", pixel_x=2001, pixel_y=2000),
+                Location(name="TestLocation3", pixel_x=2002, pixel_y=2000),
+            ]
+        )
         response = self.client.post(url,data,format='json')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         
@@ -207,6 +339,26 @@ class LocationTestCase(APITestCase):
         self.assertEqual(location1_data, nearest_location)
         self.assertEqual(location2_data, second_nearest_location)
 
+    def test_nearest_points_order(self):
+        """Test that nearest locations are ranked by distance, not by name"""
+        url = "/api/nearest/"
+        data = {"xcor": 2000, "ycor": 2000}
+        Location.objects.bulk_create(
+            [
+                Location(name="TestLocationA", pixel_x=2030, pixel_y=2030),
+                Location(name="TestLocationB", pixel_x=2000, pixel_y=2020),
+                Location(name="TestLocationC", pixel_x=2005, pixel_y=2000),
+            ]
+        )
+        response = self.client.post(url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data[0]["name"], "TestLocationC")
+        self.assertEqual(response.data[1]["name"], "TestLocationB")
+
+        # Locations without coordinates (from setUp) are never the nearest
+        nearest = Location.objects.nearest_to(2000, 2000).first()
+        self.assertEqual(nearest.name, "TestLocationC")
+
     # def test_shortest_path(self):
     #     '''Test if shortest path is returned'''
     #     url = '/api/shortestpath/'
@@ -10,7 +10,6 @@ from locations.models import Location
 # from roles.helpers import forbidden_no_privileges
 from django.db.models import Q
 from django.http import HttpRequest
-import sys
 from rest_framework.decorators import api_view
 from locations.management.commands.mapnav import (
     handle_entry,
@@ -199,46 +198,16 @@ def nearest_points(request):
                 pixel_x__range=[xcor - 400, xcor + 400],
                 pixel_y__range=[ycor - 400, ycor + 400],
             )
-        if len(filtered_locations) >= 2:
-            nearest_point_dist = sys.maxsize
-            second_nearest_point_dist = sys.maxsize
-            npi = 0
-            snpi = 1
-            for a in range(0, len(filtered_locations) - 1):
-                i = filtered_locations[a]
-                distance = 0.001 * ((i.pixel_x - xcor) ^ 2 + (i.pixel_y - ycor) ^ 2)
-                if distance <= nearest_point_dist:
-                    second_nearest_point_dist = nearest_point_dist
-                    snpi = npi
-                    npi = a
-                    nearest_point_dist = distance
-                elif distance <= second_nearest_point_dist:
-                    second_nearest_point_dist = distance
-                    snpi = a
-
-        elif len(filtered_locations) < 2:
+        nearest = list(filtered_locations.nearest_to(xcor, ycor)[:2])
+        if len(nearest) < 2:
             filtered_locations = Location.objects.filter(
                 pixel_x__range=[xcor - 1200, xcor + 1200],
                 pixel_y__range=[ycor - 1200, ycor + 1200],
             )
-            nearest_point_dist = sys.maxsize
-            second_nearest_point_dist = sys.maxsize
-            npi = 0
-            snpi = 1
-            for a in range(0, len(filtered_locations) - 1):
-                i = filtered_locations[a]
-                distance = 0.001 * ((i.pixel_x - xcor) ^ 2 + (i.pixel_y - ycor) ^ 2)
-                if distance <= nearest_point_dist:
-                    second_nearest_point_dist = nearest_point_dist
-                    snpi = npi
-                    npi = a
-                    nearest_point_dist = distance
-                elif distance <= second_nearest_point_dist:
-                    second_nearest_point_dist = distance
-                    snpi = a
-        if len(filtered_locations) >= 2:
-            locations[0] = LocationSerializer(filtered_locations[npi]).data
-            locations[1] = LocationSerializer(filtered_locations[snpi]).data
+            nearest = list(filtered_locations.nearest_to(xcor, ycor)[:2])
+        if len(nearest) >= 2:
+            locations[0] = LocationSerializer(nearest[0]).data
+            locations[1] = LocationSerializer(nearest[1]).data
 
             return Response(data=locations)
         else: